@@ -4,17 +4,54 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import threading
 import os
+import sys
+import argparse
+import multiprocessing
+import queue
+import uuid
+import socket
+import ipaddress
+import traceback
+import urllib.error
+import urllib.request
 import tempfile
+import time
+import json
+import cProfile
+import pstats
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from contextlib import nullcontext
+
+try:
+    import resource                     # Unix only – used for peak RSS
+except ImportError:
+    resource = None
+
+try:
+    import psutil                       # optional – peak RSS on Windows
+except ImportError:
+    psutil = None
 
 from moviepy.video.io.VideoFileClip import VideoFileClip
-from moviepy.video.fx.all import resize as mpy_resize   # MoviePy’s resize FX
+from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
+
+
+# Map compression level → CRF and maxrate
+COMPRESS_MAP = {
+    "Low": {"crf": "30", "maxrate": "1000k"},
+    "Medium": {"crf": "26", "maxrate": "2000k"},
+    "High": {"crf": "22", "maxrate": "4000k"}
+}
 
 
 class VideoEditorApp:
     def __init__(self, root):
         self.root = root
         self.root.title("FrameWise Video Editor")
-        self.root.geometry("800x650")
+        self.root.geometry("800x720")
         self.root.configure(bg="#ffffff")
 
         # ─────────── Variables ───────────
@@ -34,6 +71,12 @@ class VideoEditorApp:
         self.compress_level = tk.StringVar(value="Medium")
         self.video_format = tk.StringVar(value=".mp4")
 
+        # Extra output renditions encoded from the same processed frames:
+        self.renditions = []
+        self.rendition_level = tk.StringVar(value="Low")
+        self.rendition_resize = tk.DoubleVar(value=1.0)
+        self.rendition_format = tk.StringVar(value=".mp4")
+
         # Which operations are enabled:
         self.trim_enabled = tk.BooleanVar(value=False)
         self.zoom_enabled = tk.BooleanVar(value=False)
@@ -41,6 +84,18 @@ class VideoEditorApp:
         self.filter_enabled = tk.BooleanVar(value=False)
         self.adjust_enabled = tk.BooleanVar(value=False)
 
+        # Reuse the previous processed frame while the input stays unchanged:
+        self.static_skip_enabled = tk.BooleanVar(value=False)
+        self.static_tolerance = tk.DoubleVar(value=1.0)
+
+        # Optional instrumentation (JSON report / cProfile next to output):
+        self.profile_enabled = tk.BooleanVar(value=False)
+        self.cprofile_enabled = tk.BooleanVar(value=False)
+
+        # Hand jobs to a running render service (`--serve`) instead:
+        self.service_enabled = tk.BooleanVar(value=False)
+        self.service_address = tk.StringVar(value=SERVICE_ADDRESS)
+
         self.video_duration = 0.0
 
         self.setup_styles()
@@ -313,6 +368,33 @@ class VideoEditorApp:
         for widget in (self.brightness_label, self.brightness_scale, self.contrast_label, self.contrast_scale):
             widget.pack_forget()
 
+        # --- Skip Static Frames ---
+        static_frame = ttk.LabelFrame(
+            frame, text="Skip Static Frames", padding=10)
+        static_frame.pack(fill=tk.X, pady=5)
+
+        ttk.Checkbutton(
+            static_frame,
+            text="Reuse result for unchanged frames",
+            variable=self.static_skip_enabled,
+            command=self.toggle_static_skip,
+            style="Modern.TCheckbutton"
+        ).pack(anchor="w")
+
+        self.static_label = ttk.Label(
+            static_frame, text="Tolerance: 1.0", style="Modern.TLabel")
+        self.static_scale = ttk.Scale(
+            static_frame,
+            # largest cell/channel change of a 64×64 thumbnail (0 = exact)
+            from_=0.0, to=10.0,
+            variable=self.static_tolerance,
+            orient=tk.HORIZONTAL,
+            length=300,
+            command=self.update_static_label
+        )
+        for widget in (self.static_label, self.static_scale):
+            widget.pack_forget()
+
     # ─────────────────────────────── Output Tab ───────────────────────────────────
     def build_output_tab(self, frame):
         ttk.Label(frame, text="Compression Level:",
@@ -332,6 +414,111 @@ class VideoEditorApp:
             style="Hint.TLabel"
         ).pack(anchor="w")
 
+        # --- Extra Renditions ---
+        rendition_frame = ttk.LabelFrame(
+            frame, text="Extra Renditions", padding=10)
+        rendition_frame.pack(fill=tk.X, pady=(20, 5))
+
+        row = ttk.Frame(rendition_frame)
+        row.pack(anchor="w")
+        ttk.Combobox(
+            row,
+            textvariable=self.rendition_level,
+            values=levels,
+            state="readonly",
+            width=8
+        ).pack(side=tk.LEFT)
+        ttk.Spinbox(
+            row,
+            textvariable=self.rendition_resize,
+            from_=0.1, to=3.0, increment=0.1,
+            width=5
+        ).pack(side=tk.LEFT, padx=5)
+        ttk.Label(row, text="×", style="Modern.TLabel").pack(side=tk.LEFT)
+        ttk.Combobox(
+            row,
+            textvariable=self.rendition_format,
+            values=[".mp4", ".avi", ".mkv"],
+            state="readonly",
+            width=6
+        ).pack(side=tk.LEFT, padx=5)
+        ttk.Button(row, text="Add", command=self.add_rendition).pack(
+            side=tk.LEFT, padx=5)
+        ttk.Button(row, text="Remove", command=self.remove_rendition).pack(
+            side=tk.LEFT)
+
+        self.rendition_list = tk.Listbox(rendition_frame, height=3, width=60)
+        self.rendition_list.pack(anchor="w", pady=5)
+        ttk.Label(
+            rendition_frame,
+            text="Decoded and filtered once, encoded in parallel",
+            style="Hint.TLabel"
+        ).pack(anchor="w")
+
+        # --- Profiling ---
+        profile_frame = ttk.LabelFrame(frame, text="Profiling", padding=10)
+        profile_frame.pack(fill=tk.X, pady=5)
+
+        ttk.Checkbutton(
+            profile_frame,
+            text="Write profiling report (.profile.json)",
+            variable=self.profile_enabled,
+            style="Modern.TCheckbutton"
+        ).pack(anchor="w")
+        ttk.Checkbutton(
+            profile_frame,
+            text="Capture cProfile (.prof)",
+            variable=self.cprofile_enabled,
+            style="Modern.TCheckbutton"
+        ).pack(anchor="w")
+        ttk.Label(
+            profile_frame,
+            text="Reports are written next to the output file",
+            style="Hint.TLabel"
+        ).pack(anchor="w")
+
+        # --- Render Service ---
+        service_frame = ttk.LabelFrame(frame, text="Render Service", padding=10)
+        service_frame.pack(fill=tk.X, pady=5)
+
+        ttk.Checkbutton(
+            service_frame,
+            text="Submit to render service at",
+            variable=self.service_enabled,
+            style="Modern.TCheckbutton"
+        ).pack(side=tk.LEFT)
+        ttk.Entry(service_frame, textvariable=self.service_address, width=20,
+                  style="Modern.TEntry").pack(side=tk.LEFT, padx=5)
+
+    def add_rendition(self):
+        try:
+            factor = float(self.rendition_resize.get())
+        except (tk.TclError, ValueError):
+            factor = 0.0
+        if not 0.1 <= factor <= 3.0:
+            messagebox.showwarning(
+                "Warning", "Resize factor must be between 0.1 and 3.0.")
+            return
+
+        rendition = {
+            "level": self.rendition_level.get(),
+            "resize": round(factor, 2),
+            "format": self.rendition_format.get(),
+        }
+        if rendition in self.renditions:
+            return
+        self.renditions.append(rendition)
+        self.rendition_list.insert(
+            tk.END,
+            f"{rendition['level']} · {rendition['resize']:g}× · {rendition['format']}"
+            f"  →  {os.path.basename(rendition_path(self.output_path.get(), rendition))}"
+        )
+
+    def remove_rendition(self):
+        for index in reversed(self.rendition_list.curselection()):
+            self.rendition_list.delete(index)
+            del self.renditions[index]
+
     # ─────────────────────────────── Progress Tab ────────────────────────────────
     def build_progress_tab(self, frame):
         self.progress = ttk.Progressbar(
@@ -463,6 +650,18 @@ class VideoEditorApp:
     def update_contrast_label(self, val):
         self.contrast_label.config(text=f"Contrast: {float(val):.1f}")
 
+    def toggle_static_skip(self):
+        widgets = [self.static_label, self.static_scale]
+        if self.static_skip_enabled.get():
+            for w in widgets:
+                w.pack(anchor="w", pady=2)
+        else:
+            for w in widgets:
+                w.pack_forget()
+
+    def update_static_label(self, val):
+        self.static_label.config(text=f"Tolerance: {float(val):.1f}")
+
     # ────────────────────────────────── Start Processing ─────────────────────────────
     def start_processing(self):
         if not self.input_path.get():
@@ -476,214 +675,862 @@ class VideoEditorApp:
         self.progress["value"] = 0
 
         # Launch background thread so GUI stays responsive
-        threading.Thread(target=self.process_video, daemon=True).start()
+        if self.service_enabled.get():
+            target = self.submit_to_service
+        else:
+            target = self.process_video
+        threading.Thread(target=target, args=(self.collect_job(),),
+                         daemon=True).start()
+
+    def collect_job(self) -> dict:
+        """Snapshot the current settings as a job dict for `render_video`."""
+        return {
+            "input": self.input_path.get(),
+            "output": self.output_path.get(),
+            "trim_enabled": self.trim_enabled.get(),
+            "start_time": float(self.start_time.get()),
+            "end_time": float(self.end_time.get()),
+            "zoom_enabled": self.zoom_enabled.get(),
+            "zoom_factor": float(self.zoom_factor.get()),
+            "resize_enabled": self.resize_enabled.get(),
+            "resize_factor": float(self.resize_factor.get()),
+            "filter_enabled": self.filter_enabled.get(),
+            "filter_type": self.filter_type.get(),
+            "blur_kernel": int(self.blur_kernel.get()),
+            "adjust_enabled": self.adjust_enabled.get(),
+            "brightness": int(self.brightness.get()),
+            "contrast": float(self.contrast.get()),
+            "static_skip_enabled": self.static_skip_enabled.get(),
+            "static_tolerance": float(self.static_tolerance.get()),
+            "compress_level": self.compress_level.get(),
+            "renditions": list(self.renditions),
+            "profile_enabled": self.profile_enabled.get(),
+            "cprofile_enabled": self.cprofile_enabled.get(),
+        }
+
+    def report_progress(self, stage, percent):
+        """Progress callback for `render_video`; safe to call from any thread."""
+        if stage == "processing":
+            self.root.after(
+                0, lambda p=percent: self.progress.config(value=p))
+        elif stage == "encoding":
+            # Switch bar to indeterminate while MoviePy does its work
+            self.root.after(
+                0, lambda: self.progress.config(mode="indeterminate"))
+            self.root.after(0, lambda: self.progress.start(10))
+        elif stage == "done":
+            # Switch progress bar back to determinate and fill to 100%
+            self.root.after(0, lambda: self.progress.stop())
+            self.root.after(
+                0, lambda: self.progress.config(mode="determinate"))
+            self.root.after(0, lambda: self.progress.config(value=100))
+
+    def show_error(self, message):
+        # Leave indeterminate mode if the failure happened while encoding
+        self.root.after(0, lambda: self.progress.stop())
+        self.root.after(0, lambda: self.progress.config(mode="determinate"))
+        self.root.after(0, lambda: messagebox.showerror("Error", message))
+        self.root.after(0, lambda: self.status_label.config(
+            text="❌ Error processing video!", foreground="red"
+        ))
 
     # ────────────────────────────────── Main Processing ─────────────────────────────
-    def process_video(self):
+    def process_video(self, job):
         try:
-            input_video = self.input_path.get()
-            output_video = self.output_path.get()
-            start_time = float(self.start_time.get())
-            end_time = float(self.end_time.get())
-            zoom_factor = float(self.zoom_factor.get())
-            resize_factor = float(self.resize_factor.get())
-            filter_type = self.filter_type.get()
-            brightness = int(self.brightness.get())
-            contrast = float(self.contrast.get())
-            blur_kernel = int(self.blur_kernel.get())
-
-            # Map compression level → CRF and maxrate
-            compress_map = {
-                "Low": {"crf": "30", "maxrate": "1000k"},
-                "Medium": {"crf": "26", "maxrate": "2000k"},
-                "High": {"crf": "22", "maxrate": "4000k"}
-            }
-            compression = compress_map[self.compress_level.get()]
-            crf = compression["crf"]
-            maxrate = compression["maxrate"]
+            render_video(job, on_progress=self.report_progress)
+            self.root.after(0, self.show_completion)
+        except Exception as e:
+            # On any exception, show error & update status
+            self.show_error(str(e))
+
+    def submit_to_service(self, job):
+        # The service may run in another working directory
+        job = dict(job, input=os.path.abspath(job["input"]),
+                   output=os.path.abspath(job["output"]))
+        address = self.service_address.get()
+        try:
+            job_id = submit_job(address, job)
+            for status in stream_job_events(address, job_id):
+                if status["state"] == "failed":
+                    raise Exception(status["error"])
+                self.report_progress(status["stage"], status["progress"])
+                if status["state"] == "done":
+                    self.root.after(0, self.show_completion)
+                    return
+            raise Exception("Render service closed the connection.")
+        except Exception as e:
+            self.show_error(str(e))
+
+    def show_completion(self):
+        self.status_label.config(
+            text="✅ Video processed successfully!", foreground="#4CAF50"
+        )
+        messagebox.showinfo("Success", "Processing completed!")
+
+
+# ─────────────────────────────────── Render Engine ──────────────────────────────────
+DEFAULT_JOB = {
+    "input": "",
+    "output": "output.mp4",
+    "trim_enabled": False, "start_time": 0.0, "end_time": 0.0,
+    "zoom_enabled": False, "zoom_factor": 1.0,
+    "resize_enabled": False, "resize_factor": 1.0,
+    "filter_enabled": False, "filter_type": "none", "blur_kernel": 5,
+    "adjust_enabled": False, "brightness": 0, "contrast": 1.0,
+    "static_skip_enabled": False, "static_tolerance": 1.0,
+    "compress_level": "Medium",
+    "renditions": [],
+    "profile_enabled": False, "cprofile_enabled": False,
+}
+
+
+def render_video(job, on_progress=None):
+    """
+    Run one render job (see DEFAULT_JOB for its keys) without any GUI.
 
-            # ─── 1) Open input video with OpenCV ─────────────────────────────────
-            cap = cv2.VideoCapture(input_video)
-            if not cap.isOpened():
-                raise Exception("Cannot open video file with OpenCV.")
+    The source is decoded and run through the op chain once; each processed
+    frame is fanned out to one encoder per rendition (see RenditionWriter).
 
+    `on_progress(stage, percent)` is called with stage "processing" (0‥95 %,
+    only when the percentage changes), "encoding" and "done".
+    Returns the list of written output files.
+    """
+    job = dict(DEFAULT_JOB, **job)
+    on_progress = on_progress or (lambda stage, percent: None)
+
+    input_video = job["input"]
+    output_video = job["output"]
+    trim_enabled = job["trim_enabled"]
+    start_time = float(job["start_time"])
+    end_time = float(job["end_time"])
+    zoom_factor = float(job["zoom_factor"])
+    filter_type = job["filter_type"]
+    brightness = int(job["brightness"])
+    contrast = float(job["contrast"])
+    blur_kernel = int(job["blur_kernel"])
+
+    if job["profile_enabled"] or job["cprofile_enabled"]:
+        profiler = RenderProfiler(capture_cprofile=job["cprofile_enabled"])
+    else:
+        profiler = NullProfiler()
+    profiler.start()
+
+    try:
+        # Main output first, then any extra renditions of the same frames
+        renditions = [{
+            "path": output_video,
+            "level": job["compress_level"],
+            "resize": float(job["resize_factor"]) if job["resize_enabled"] else 1.0,
+        }]
+        for extra in job["renditions"]:
+            renditions.append(
+                dict(extra, path=rendition_path(output_video, extra)))
+
+        # ─── 1) Open input video with OpenCV ─────────────────────────────────────
+        cap = cv2.VideoCapture(input_video)
+        if not cap.isOpened():
+            raise Exception("Cannot open video file with OpenCV.")
+
+        # Everything below owns resources (cap, temp audio, ffmpeg processes)
+        # that must be released however the job ends
+        audio_path = None
+        writers = []
+        try:
             fps = cap.get(cv2.CAP_PROP_FPS)
             width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
             height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
-            # Compute final dimensions for MoviePy resize step:
-            if self.resize_enabled.get():
-                final_width = int(width * resize_factor)
-                final_height = int(height * resize_factor)
-            else:
-                final_width, final_height = width, height
-
-            # ─── 2) Create a temporary MP4 in the OS temp directory ───────────────
-            temp_fd, temp_path = tempfile.mkstemp(suffix=".mp4")
-            os.close(temp_fd)
-
-            # OpenCV writes each processed frame at original (width, height).
-            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-            out = cv2.VideoWriter(temp_path, fourcc, fps, (width, height))
+            if profiler.enabled:
+                profiler.info.update({
+                    "input": input_video,
+                    "output": output_video,
+                    "source_fps": fps,
+                    "source_size": [width, height],
+                    "source_frames": total_frames,
+                    "renditions": renditions,
+                    "clip_duration_s": (end_time - start_time if trim_enabled
+                                        else total_frames / fps),
+                })
+
+            # ─── 2) Extract the (trimmed) audio once for all renditions ──────────
+            with profiler.stage("audio_extract"):
+                audio_path = extract_audio(
+                    input_video, (start_time, end_time) if trim_enabled else None)
+
+            # ─── 3) One encoder thread + ffmpeg process per rendition ────────────
+            encode_started = time.perf_counter()
+            for rendition in renditions:
+                # ffmpeg is spawned in the constructor; track each writer at
+                # once so a later failure can still shut it down
+                writers.append(RenditionWriter(
+                    rendition, (width, height), fps, audio_path, profiler))
+                writers[-1].start()
+
+            static_detector = None
+            if job["static_skip_enabled"]:
+                static_detector = StaticFrameDetector(
+                    float(job["static_tolerance"]))
+                profiler.count("frames_skipped_static", 0)
+            last_processed = None
 
             frame_count = 0
+            last_percent = -1
             while cap.isOpened():
-                ret, frame = cap.read()
-                if not ret:
+                current_time = frame_count / fps
+                # Nothing after the trim window is needed → stop decoding
+                if trim_enabled and current_time > end_time:
                     break
 
-                current_time = frame_count / fps
+                with profiler.stage("decode"):
+                    ret, frame = cap.read()
+                if not ret:
+                    break
+                profiler.count("frames_decoded")
 
                 # If trim is enabled, skip frames outside [start_time, end_time]
-                if self.trim_enabled.get() and not (start_time <= current_time <= end_time):
-                    frame_count += 1
-                    percent = int((frame_count / total_frames) * 80)
-                    self.root.after(
-                        0, lambda p=percent: self.progress.config(value=p))
-                    continue
+                if not trim_enabled or start_time <= current_time:
+                    # 0) Input unchanged since the last processed frame → reuse it
+                    is_static = False
+                    if static_detector is not None:
+                        with profiler.stage("fingerprint"):
+                            is_static = static_detector.is_static(frame)
+
+                    if is_static and last_processed is not None:
+                        frame = last_processed
+                        profiler.count("frames_skipped_static")
+                    else:
+                        # 1) Zoom (crop) if enabled
+                        if job["zoom_enabled"]:
+                            with profiler.stage("crop_and_zoom"):
+                                frame = crop_and_zoom(frame, zoom_factor)
+
+                        # 2) Apply filter if requested
+                        if job["filter_enabled"] and filter_type != "none":
+                            with profiler.stage(f"filter_{filter_type}"):
+                                if filter_type == "gray":
+                                    grey = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                                    frame = cv2.cvtColor(grey, cv2.COLOR_GRAY2BGR)
+                                elif filter_type == "blur":
+                                    k = blur_kernel
+                                    frame = cv2.GaussianBlur(frame, (k, k), 0)
+                                elif filter_type == "edge":
+                                    edges = cv2.Canny(frame, 100, 200)
+                                    frame = cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
+
+                        # 3) Adjust brightness/contrast if requested
+                        if job["adjust_enabled"]:
+                            with profiler.stage("convertScaleAbs"):
+                                frame = cv2.convertScaleAbs(
+                                    frame, alpha=contrast, beta=brightness)
+
+                        # ffmpeg reads RGB; converted once, shared by all writers
+                        with profiler.stage("to_rgb"):
+                            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                        last_processed = frame
+
+                    # 4) Fan the frame out to every rendition's encoder
+                    with profiler.stage("fanout"):
+                        for writer in writers:
+                            writer.put(frame)
+                    profiler.count("frames_written")
 
-                # 1) Zoom (crop) if enabled
-                if self.zoom_enabled.get():
-                    frame = crop_and_zoom(frame, zoom_factor)
-
-                # 2) Apply filter if requested
-                if self.filter_enabled.get() and filter_type != "none":
-                    if filter_type == "gray":
-                        grey = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                        frame = cv2.cvtColor(grey, cv2.COLOR_GRAY2BGR)
-                    elif filter_type == "blur":
-                        k = blur_kernel
-                        frame = cv2.GaussianBlur(frame, (k, k), 0)
-                    elif filter_type == "edge":
-                        edges = cv2.Canny(frame, 100, 200)
-                        frame = cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
-
-                # 3) Adjust brightness/contrast if requested
-                if self.adjust_enabled.get():
-                    frame = cv2.convertScaleAbs(
-                        frame, alpha=contrast, beta=brightness)
-
-                # 4) Write this frame (zoomed if zoom_enabled) at original resolution
-                out.write(frame)
                 frame_count += 1
 
-                # Update progress up to 80%
-                percent = int((frame_count / total_frames) * 80)
-                self.root.after(
-                    0, lambda p=percent: self.progress.config(value=p))
-
+                # Update progress up to 95%
+                percent = int((frame_count / total_frames) * 95)
+                if percent != last_percent:
+                    last_percent = percent
+                    on_progress("processing", percent)
+
+            # ─── 5) Let every encoder drain its queue and finish its file ────────
+            on_progress("encoding", 95)
+            for writer in writers:
+                writer.finish()
+            if profiler.enabled:
+                profiler.info["encode_wall_s"] = time.perf_counter() - encode_started
+        except Exception:
+            for writer in writers:
+                writer.cancel()
+            raise
+        finally:
             cap.release()
-            out.release()
-
-            # ─── 3) Did any frame‐by‐frame processing occur? ─────────────────────────
-            did_processing = any([
-                self.trim_enabled.get(),
-                self.filter_enabled.get(),
-                self.adjust_enabled.get(),
-                self.zoom_enabled.get(),
-                self.resize_enabled.get()
-            ])
-
-            if did_processing:
-                # a) Grab audio (and trim if needed) from the original
-                original_clip = VideoFileClip(input_video)
-                if self.trim_enabled.get():
-                    audio_clip = original_clip.subclip(
-                        start_time, end_time).audio
-                else:
-                    audio_clip = original_clip.audio
-
-                # b) Switch bar to indeterminate while MoviePy does its work
-                self.root.after(
-                    0, lambda: self.progress.config(mode="indeterminate"))
-                self.root.after(0, lambda: self.progress.start(10))
-
-                # c) Re‐open the temp MP4 in MoviePy
-                processed_frames = VideoFileClip(temp_path)
-
-                # d) Now upsample if resize_enabled
-                if self.resize_enabled.get():
-                    processed_frames = mpy_resize(
-                        processed_frames, newsize=(final_width, final_height))
-                # If resize wasn’t enabled, processed_frames stays at (width, height)
-
-                # e) Attach audio
-                final_clip = processed_frames.set_audio(audio_clip)
-
-                # f) Write exactly one final file (with audio) in chosen format + CRF
-                final_clip.write_videofile(
-                    output_video,
-                    codec="libx264",
-                    audio_codec="aac",
-                    ffmpeg_params=["-crf", crf, "-preset", "veryfast",
-                                   "-maxrate", maxrate, "-bufsize", maxrate]
-                )
-
-                # ─── 4) Clean up MoviePy readers ───────────────────────────────
-                try:
-                    processed_frames.reader.close()
-                    processed_frames.audio.reader.close_proc()
-                    audio_clip.reader.close_proc()
-                    original_clip.reader.close()
-                except Exception:
-                    pass
+            if audio_path is not None and os.path.exists(audio_path):
+                os.remove(audio_path)
 
-                # g) Delete the temporary file so only “output_video” remains
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
+        # ─── 6) Write the profiling report next to the output ─────────────────────
+        profiler.stop()
+        if profiler.enabled:
+            profiler.write_report(output_video)
 
-                # h) Switch progress bar back to determinate and fill to 100%
-                self.root.after(0, lambda: self.progress.stop())
-                self.root.after(
-                    0, lambda: self.progress.config(mode="determinate"))
-                self.root.after(0, lambda: self.progress.config(value=100))
+        on_progress("done", 100)
+        return [r["path"] for r in renditions]
 
-                # i) Notify “done”
-                self.root.after(0, self.show_completion)
+    except Exception:
+        profiler.stop()
+        raise
 
-            else:
-                # No frame‐by‐frame ops: only re‐encode for compression
-                clip = VideoFileClip(input_video)
-
-                # Indeterminate while re‐encoding
-                self.root.after(
-                    0, lambda: self.progress.config(mode="indeterminate"))
-                self.root.after(0, lambda: self.progress.start(10))
-
-                clip.write_videofile(
-                    output_video,
-                    codec="libx264",
-                    audio_codec="aac",
-                    ffmpeg_params=["-crf", crf, "-preset", "veryfast",
-                                   "-maxrate", maxrate, "-bufsize", maxrate]
-                )
-                try:
-                    clip.reader.close()
-                    clip.audio.reader.close_proc()
-                except Exception:
-                    pass
 
-                # Back to determinate, fill at 100%
-                self.root.after(0, lambda: self.progress.stop())
-                self.root.after(
-                    0, lambda: self.progress.config(mode="determinate"))
-                self.root.after(0, lambda: self.progress.config(value=100))
+def extract_audio(input_video, subclip=None):
+    """
+    Write the audio of `input_video` (cut to `subclip` = (start, end) when
+    given) to a temporary AAC file and return its path, or None if the video
+    has no audio track.
+    """
+    clip = VideoFileClip(input_video)
+    try:
+        if clip.audio is None:
+            return None
+        audio_clip = clip.subclip(*subclip).audio if subclip else clip.audio
+        temp_fd, temp_path = tempfile.mkstemp(suffix=".m4a")
+        os.close(temp_fd)
+        try:
+            audio_clip.write_audiofile(temp_path, codec="aac", logger=None)
+        except Exception:
+            os.remove(temp_path)
+            raise
+        return temp_path
+    finally:
+        # Clean up MoviePy readers
+        try:
+            clip.reader.close()
+            if clip.audio is not None:
+                clip.audio.reader.close_proc()
+        except Exception:
+            pass
 
-                self.root.after(0, self.show_completion)
 
-        except Exception as e:
-            # On any exception, show error & update status
-            self.root.after(0, lambda: messagebox.showerror("Error", str(e)))
-            self.root.after(0, lambda: self.status_label.config(
-                text="❌ Error processing video!", foreground="red"
-            ))
+# ─────────────────────────────────── Render Service ─────────────────────────────────
+SERVICE_PORT = 8765
+SERVICE_ADDRESS = f"127.0.0.1:{SERVICE_PORT}"
+SERVICE_TIMEOUT = 60        # seconds; the event stream sends a keep-alive every 15
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv")
+FILTER_TYPES = ("none", "gray", "blur", "edge")
 
-    def show_completion(self):
-        self.status_label.config(
-            text="✅ Video processed successfully!", foreground="#4CAF50"
+_worker_events = None       # per-worker queue for progress events
+
+
+def _init_worker(events):
+    """
+    Pool initializer. cv2/MoviePy are already imported with this module; make
+    sure MoviePy has also located its ffmpeg binary before the first job.
+    """
+    global _worker_events
+    _worker_events = events
+    from moviepy.config import get_setting
+    get_setting("FFMPEG_BINARY")
+
+
+def _warm_up():
+    return os.getpid()
+
+
+def _run_job(job_id, job):
+    """Executed inside a pool worker process."""
+    def on_progress(stage, percent):
+        _worker_events.put((job_id, stage, percent))
+
+    on_progress("starting", 0)
+    return render_video(job, on_progress=on_progress)
+
+
+def validate_job(job):
+    """
+    Check a submitted job dict: known keys, value types as in DEFAULT_JOB and
+    valid renditions. Raises ValueError describing the first problem.
+    """
+    if not isinstance(job, dict):
+        raise ValueError("Job must be a JSON object.")
+    unknown = set(job) - set(DEFAULT_JOB)
+    if unknown:
+        raise ValueError(f"Unknown job keys: {', '.join(sorted(unknown))}")
+
+    for key, value in job.items():
+        expected = DEFAULT_JOB[key]
+        if isinstance(expected, bool):
+            ok = isinstance(value, bool)
+        elif isinstance(expected, (int, float)):
+            ok = (isinstance(value, (int, float)) and not isinstance(value, bool)
+                  and (isinstance(expected, float) or isinstance(value, int)))
+        else:
+            ok = isinstance(value, type(expected))
+        if not ok:
+            raise ValueError(
+                f"'{key}' must be of type {type(expected).__name__}.")
+
+    if not job.get("input"):
+        raise ValueError("Job has no input video.")
+    if job.get("compress_level", "Medium") not in COMPRESS_MAP:
+        raise ValueError(f"Unknown compression level: {job['compress_level']}")
+    if job.get("filter_type", "none") not in FILTER_TYPES:
+        raise ValueError(f"Unknown filter type: {job['filter_type']}")
+    kernel = job.get("blur_kernel", DEFAULT_JOB["blur_kernel"])
+    if kernel < 1 or kernel % 2 == 0:
+        raise ValueError("'blur_kernel' must be a positive odd number.")
+
+    for rendition in job.get("renditions", []):
+        if not isinstance(rendition, dict) or set(rendition) != {"level", "resize", "format"}:
+            raise ValueError(
+                "Each rendition needs exactly 'level', 'resize' and 'format'.")
+        if rendition["level"] not in COMPRESS_MAP:
+            raise ValueError(f"Unknown rendition level: {rendition['level']}")
+        resize = rendition["resize"]
+        if (not isinstance(resize, (int, float)) or isinstance(resize, bool)
+                or not 0.1 <= resize <= 3.0):
+            raise ValueError("Rendition 'resize' must be between 0.1 and 3.0.")
+        if rendition["format"] not in VIDEO_EXTENSIONS:
+            raise ValueError(f"Unknown rendition format: {rendition['format']}")
+
+
+def is_loopback(host):
+    """True if every address `host` resolves to is a loopback address."""
+    try:
+        infos = socket.getaddrinfo(host, None)
+    except socket.gaierror:
+        return False
+    return all(ipaddress.ip_address(info[4][0]).is_loopback for info in infos)
+
+
+def is_loopback_host_header(host_header, port):
+    """
+    True if an HTTP `Host` header names this machine's loopback interface on
+    `port`, e.g. "127.0.0.1:8765", "localhost:8765" or "[::1]:8765".
+    """
+    if not host_header:
+        return False
+    host_header = host_header.strip()
+    if host_header.startswith("["):
+        host, _, rest = host_header[1:].partition("]")
+        host_port = rest[1:] if rest.startswith(":") else ""
+    else:
+        host, _, host_port = host_header.partition(":")
+    if host_port != str(port):
+        return False
+    host = host.lower()
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class RenderService:
+    """
+    Local render daemon: a warm pool of worker processes behind a small
+    localhost HTTP API.
+
+    - POST /jobs             → submit a job (JSON, keys as in DEFAULT_JOB)
+    - GET  /jobs             → status of all jobs
+    - GET  /jobs/<id>        → status of one job
+    - GET  /jobs/<id>/events → newline-delimited JSON status stream until the
+                               job is done or failed
+    Optionally watches a drop folder and renders new videos automatically.
+
+    Jobs name arbitrary files to write, so the API only accepts
+    `application/json` requests without an `Origin` header (no browser can
+    send those cross-site without a preflight) and, unless `allow_remote` is
+    set, only a loopback `Host` header (defeats DNS rebinding). Binding to a
+    non-loopback address needs `allow_remote=True`.
+
+    Finished jobs are forgotten after JOB_RETENTION seconds, and beyond
+    MAX_FINISHED_JOBS the oldest ones go first.
+    """
+
+    JOB_RETENTION = 24 * 3600
+    MAX_FINISHED_JOBS = 500
+    WATCH_RETRIES = 2           # drop-folder resubmits after a worker crash
+
+    def __init__(self, host="127.0.0.1", port=SERVICE_PORT, workers=None,
+                 watch_dir=None, job_template=None, allow_remote=False):
+        if not allow_remote and not is_loopback(host):
+            raise ValueError(
+                f"Refusing to listen on non-loopback address {host!r}; "
+                "pass allow_remote to expose the render service.")
+        self.host = host
+        self.port = port
+        self.allow_remote = allow_remote
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self.watch_dir = watch_dir
+        self.job_template = job_template or {}
+
+        self.jobs = {}
+        self._changed = threading.Condition()
+        self._stopping = threading.Event()
+        # Workers are spawned, never forked: pools get rebuilt from HTTP and
+        # watcher threads while the rest of the service keeps running
+        self._mp_context = multiprocessing.get_context("spawn")
+        self._events = None
+        self._pool_lock = threading.Lock()
+        self._pool = self._new_pool()
+        self._httpd = None
+
+        # Drop folder bookkeeping: input path → state
+        self._watch_lock = threading.Lock()
+        self._watch_submitted = set()
+        self._watch_retry = {}          # path → resubmits left
+        self._watch_jobs = {}           # job id → input path
+
+    # ─── Worker pool ───────────────────────────────────────────────────────────────
+    def _new_pool(self):
+        """
+        New pool with its own events queue: a worker killed while holding a
+        queue's write lock would otherwise block every later worker on it.
+        """
+        old_events = self._events
+        self._events = self._mp_context.Queue()
+        if old_events is not None:
+            old_events.cancel_join_thread()
+            old_events.close()
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=self._mp_context,
+            initializer=_init_worker,
+            initargs=(self._events,)
         )
-        messagebox.showinfo("Success", "Processing completed!")
+
+    def _warm_pool(self):
+        """Start every worker now so the first job doesn't pay for imports."""
+        for future in [self._pool.submit(_warm_up) for _ in range(self.workers)]:
+            future.result()
+
+    def _restart_pool(self, broken):
+        """
+        Replace a pool broken by a dead worker (segfault, OOM killer, …). Jobs
+        that were running in it fail with BrokenProcessPool.
+        """
+        with self._pool_lock:
+            if self._pool is not broken:
+                return              # another thread already replaced it
+            print("Worker pool broken; restarting it.")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._pool = self._new_pool()
+            self._warm_pool()
+
+    def _submit_to_pool(self, *args):
+        pool = self._pool
+        try:
+            return pool.submit(*args)
+        except BrokenProcessPool:
+            self._restart_pool(pool)
+            return self._pool.submit(*args)
+
+    # ─── Jobs ──────────────────────────────────────────────────────────────────────
+    def submit(self, job):
+        """
+        Queue `job` and return its id. Raises ValueError for an invalid job
+        and RuntimeError when the worker pool can't take it.
+        """
+        validate_job(job)
+
+        job_id = uuid.uuid4().hex[:12]
+        status = {
+            "id": job_id,
+            "input": job["input"],
+            "output": job.get("output", DEFAULT_JOB["output"]),
+            "state": "queued",
+            "stage": "queued",
+            "progress": 0,
+            "submitted": time.time(),
+            "finished": None,
+            "outputs": [],
+            "error": None,
+        }
+        # Only record the job once a worker pool has actually accepted it
+        future = self._submit_to_pool(_run_job, job_id, job)
+        with self._changed:
+            self.jobs[job_id] = status
+        future.add_done_callback(
+            lambda f, job_id=job_id: self._job_finished(job_id, f))
+        return job_id
+
+    def _update(self, job_id, **changes):
+        with self._changed:
+            self.jobs[job_id].update(changes)
+            self._changed.notify_all()
+
+    def _job_finished(self, job_id, future):
+        try:
+            outputs = future.result()
+        except Exception as e:
+            self._update(job_id, state="failed", stage="failed",
+                         error=str(e) or type(e).__name__, finished=time.time())
+            if isinstance(e, BrokenProcessPool):
+                self._requeue_watched(job_id)
+        else:
+            self._update(job_id, state="done", stage="done", progress=100,
+                         outputs=outputs, finished=time.time())
+        with self._watch_lock:
+            self._watch_jobs.pop(job_id, None)
+        self._prune_jobs()
+
+    def _prune_jobs(self):
+        """Forget finished jobs past JOB_RETENTION or beyond MAX_FINISHED_JOBS."""
+        cutoff = time.time() - self.JOB_RETENTION
+        with self._changed:
+            finished = sorted(
+                (status["finished"], job_id)
+                for job_id, status in self.jobs.items()
+                if status["finished"] is not None
+            )
+            excess = len(finished) - self.MAX_FINISHED_JOBS
+            for index, (finished_at, job_id) in enumerate(finished):
+                if index < excess or finished_at < cutoff:
+                    del self.jobs[job_id]
+
+    def _drain_events(self):
+        while not self._stopping.is_set():
+            try:
+                # re-read each time: a restarted pool brings a new queue
+                job_id, stage, percent = self._events.get(timeout=0.5)
+            except (queue.Empty, OSError, ValueError):
+                continue
+            with self._changed:
+                status = self.jobs.get(job_id)
+                if status is None or status["state"] in ("done", "failed"):
+                    continue
+                status.update(state="running", stage=stage, progress=percent)
+                self._changed.notify_all()
+
+    def status(self, job_id):
+        """Copy of the job's status, or None if it is unknown or pruned."""
+        with self._changed:
+            status = self.jobs.get(job_id)
+            return dict(status) if status is not None else None
+
+    def watch_status(self, job_id, timeout=15.0):
+        """
+        Yield a snapshot of the job's status whenever it changes (or every
+        `timeout` seconds as a keep-alive), ending with the final state.
+        """
+        last = None
+        while True:
+            with self._changed:
+                current = self.status(job_id)
+                if current is not None and current == last:
+                    self._changed.wait(timeout)
+                    current = self.status(job_id)
+            if current is None:
+                return
+            last = current
+            yield current
+            if current["state"] in ("done", "failed"):
+                return
+
+    # ─── Drop folder ───────────────────────────────────────────────────────────────
+    def _watch_loop(self, interval=2.0):
+        """
+        Submit every new video that appears in `watch_dir`. A file is picked up
+        once its size stopped changing between two scans; results go to
+        `watch_dir/processed`.
+        """
+        out_dir = os.path.join(self.watch_dir, "processed")
+        os.makedirs(out_dir, exist_ok=True)
+        sizes = {}
+        submitted = self._watch_submitted
+        while not self._stopping.wait(interval):
+            try:
+                names = sorted(os.listdir(self.watch_dir))
+            except OSError as e:
+                print(f"[watch] cannot list {self.watch_dir}: {e}")
+                continue
+
+            for name in names:
+                path = os.path.join(self.watch_dir, name)
+                try:
+                    if (path in submitted or not os.path.isfile(path)
+                            or not name.lower().endswith(VIDEO_EXTENSIONS)):
+                        continue
+                    # Copy tools often write a temp file and rename it, so
+                    # entries can vanish between listdir and here
+                    size = os.path.getsize(path)
+                    if sizes.get(path) != size:
+                        sizes[path] = size      # still being copied in
+                        continue
+
+                    output = os.path.join(out_dir, name)
+                    with self._watch_lock:
+                        retrying = path in self._watch_retry
+                        # a crashed job may have left a partial output behind
+                        if os.path.exists(output) and not retrying:
+                            submitted.add(path)
+                            continue
+                    job_id = self.submit(dict(self.job_template, input=path,
+                                              output=output))
+                    with self._watch_lock:
+                        submitted.add(path)
+                        self._watch_jobs[job_id] = path
+                except OSError:
+                    continue
+                except ValueError as e:
+                    submitted.add(path)
+                    print(f"[watch] skipping {name}: {e}")
+                except Exception:
+                    # e.g. the pool couldn't take the job → retry next scan
+                    print(f"[watch] failed to submit {name}:")
+                    traceback.print_exc()
+
+    def _requeue_watched(self, job_id):
+        """
+        A drop-folder job lost to a crashed worker is scanned again, up to
+        WATCH_RETRIES times, then dropped with a log line.
+        """
+        with self._watch_lock:
+            path = self._watch_jobs.get(job_id)
+            if path is None:
+                return
+            retries = self._watch_retry.get(path, self.WATCH_RETRIES)
+            if retries > 0:
+                self._watch_retry[path] = retries - 1
+                self._watch_submitted.discard(path)
+                print(f"[watch] worker crashed on {os.path.basename(path)}; "
+                      "will retry")
+            else:
+                self._watch_retry.pop(path, None)
+                print(f"[watch] dropping {os.path.basename(path)}: worker "
+                      "crashed on every attempt")
+
+    # ─── HTTP ──────────────────────────────────────────────────────────────────────
+    def serve_forever(self):
+        self._warm_pool()
+
+        threading.Thread(target=self._drain_events, daemon=True).start()
+        if self.watch_dir:
+            threading.Thread(target=self._watch_loop, daemon=True).start()
+
+        self._httpd = ThreadingHTTPServer(
+            (self.host, self.port), _make_service_handler(self))
+        self.port = self._httpd.server_address[1]
+        print(f"FrameWise render service on http://{self.host}:{self.port} "
+              f"({self.workers} workers)")
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        self._stopping.set()
+        if self._httpd is not None:
+            self._httpd.server_close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _make_service_handler(service):
+    class ServiceHandler(BaseHTTPRequestHandler):
+        def send_json(self, code, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def refuse_browser(self, require_json=False):
+            """
+            Send an error and return True for requests a web page could have
+            made: any with an Origin header, any addressed to a non-loopback
+            Host (DNS rebinding) unless remote access is allowed, or (for
+            POST) any body that isn't application/json.
+            """
+            if not service.allow_remote and not is_loopback_host_header(
+                    self.headers.get("Host"), service.port):
+                self.send_json(403, {"error": "Host not allowed."})
+                return True
+            if self.headers.get("Origin") is not None:
+                self.send_json(403, {"error": "Cross-origin requests are not allowed."})
+                return True
+            content_type = self.headers.get("Content-Type", "")
+            if require_json and content_type.split(";")[0].strip().lower() != "application/json":
+                self.send_json(415, {"error": "Content-Type must be application/json."})
+                return True
+            return False
+
+        def do_GET(self):
+            if self.refuse_browser():
+                return
+            parts = [p for p in self.path.split("/") if p]
+            if parts == ["jobs"]:
+                with service._changed:
+                    jobs = [dict(j) for j in service.jobs.values()]
+                return self.send_json(200, jobs)
+            status = service.status(parts[1]) if len(parts) >= 2 else None
+            if parts[:1] != ["jobs"] or status is None:
+                return self.send_json(404, {"error": "No such job."})
+
+            job_id = parts[1]
+            if len(parts) == 2:
+                return self.send_json(200, status)
+            if parts[2:] == ["events"]:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                try:
+                    for status in service.watch_status(job_id):
+                        self.wfile.write(json.dumps(status).encode("utf-8") + b"\n")
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                return
+            self.send_json(404, {"error": "Not found."})
+
+        def do_POST(self):
+            if self.refuse_browser(require_json=True):
+                return
+            if self.path.rstrip("/") != "/jobs":
+                return self.send_json(404, {"error": "Not found."})
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                job = json.loads(self.rfile.read(length) or b"{}")
+                job_id = service.submit(job)
+            except ValueError as e:             # also bad JSON
+                return self.send_json(400, {"error": str(e)})
+            except RuntimeError as e:           # e.g. BrokenProcessPool
+                return self.send_json(503, {"error": f"Render service unavailable: {e}"})
+            self.send_json(202, {"id": job_id})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ServiceHandler
+
+
+def submit_job(address, job):
+    """Submit `job` to the render service at host:port and return its id."""
+    request = urllib.request.Request(
+        f"http://{address}/jobs",
+        data=json.dumps(job).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return json.load(response)["id"]
+    except urllib.error.HTTPError as e:
+        raise Exception(json.load(e).get("error", str(e)))
+    except urllib.error.URLError as e:
+        raise Exception(f"Render service not reachable at {address}: {e.reason}")
+
+
+def stream_job_events(address, job_id, timeout=SERVICE_TIMEOUT):
+    """
+    Yield status dicts from the service's event stream for `job_id`. Raises if
+    nothing (not even a keep-alive) arrives for `timeout` seconds.
+    """
+    stalled = f"Render service stopped responding (no update for {timeout} s)."
+    try:
+        with urllib.request.urlopen(f"http://{address}/jobs/{job_id}/events",
+                                    timeout=timeout) as response:
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+    except socket.timeout:
+        raise Exception(stalled)
+    except urllib.error.HTTPError as e:
+        raise Exception(json.load(e).get("error", str(e)))
+    except urllib.error.URLError as e:
+        if isinstance(e.reason, socket.timeout):
+            raise Exception(stalled)
+        raise Exception(f"Render service not reachable at {address}: {e.reason}")
 
 
 def crop_and_zoom(frame: np.ndarray, factor: float) -> np.ndarray:
@@ -723,7 +1570,527 @@ def crop_and_zoom(frame: np.ndarray, factor: float) -> np.ndarray:
         return canvas
 
 
+class StaticFrameDetector:
+    """
+    Cheap check for “this frame looks like the last one we processed”.
+
+    Each frame is reduced to a 64×64 colour thumbnail, i.e. the per-channel
+    mean of every cell of a 64×64 grid, and compared with the thumbnail of the
+    last frame that went through the op chain (not merely the previous frame,
+    so slow fades can't drift by unnoticed).
+
+    - tolerance == 0  → frames must be bit-identical
+    - tolerance  > 0  → largest change of any single cell and channel
+                        (0‥255 scale)
+
+    Using the largest cell change rather than the mean keeps small local edits
+    such as a newly typed character in a screen recording: on a 1080p frame
+    even a 3×3 px dot changes its cell by ~5, while the default of 1.0 only
+    absorbs rounding noise. Channels are compared separately (no grey
+    conversion), so a change of colour at equal brightness is not missed.
+    """
+
+    THUMB_SIZE = (64, 64)
+
+    def __init__(self, tolerance: float = 0.0):
+        self.tolerance = max(0.0, tolerance)
+        self._anchor = None
+
+    def signature(self, frame: np.ndarray) -> np.ndarray:
+        small = cv2.resize(frame, self.THUMB_SIZE,
+                           interpolation=cv2.INTER_AREA)
+        return small.astype(np.int16)
+
+    def is_static(self, frame: np.ndarray) -> bool:
+        """
+        Return True if `frame` matches the anchor; otherwise make it the new
+        anchor and return False.
+        """
+        if self.tolerance == 0.0:
+            current = frame
+            same = (self._anchor is not None
+                    and np.array_equal(current, self._anchor))
+        else:
+            current = self.signature(frame)
+            same = (self._anchor is not None
+                    and int(np.abs(current - self._anchor).max()) <= self.tolerance)
+        if not same:
+            self._anchor = current
+        return same
+
+
+# ─────────────────────────────────── Renditions ─────────────────────────────────────
+def rendition_path(output_video: str, rendition: dict) -> str:
+    """
+    Output file name for an extra rendition, derived from the main output,
+    e.g. output.mp4 + {Low, 0.5×, .mkv} → output_low_0.5x.mkv
+    """
+    base = os.path.splitext(output_video)[0]
+    return f"{base}_{rendition['level'].lower()}_{rendition['resize']:g}x{rendition['format']}"
+
+
+class RenditionWriter(threading.Thread):
+    """
+    Encodes one output rendition in its own thread.
+
+    The decode loop hands every processed RGB frame to `put`; this thread
+    resizes it (same interpolation as MoviePy's resize FX) and pipes it into
+    its own ffmpeg/libx264 process, which muxes in the shared audio file.
+    Several writers fed from one loop encode in parallel.
+    """
+
+    QUEUE_SIZE = 8
+
+    def __init__(self, rendition, size, fps, audio_path=None, profiler=None):
+        super().__init__(daemon=True)
+        self.rendition = rendition
+        self.fps = fps
+        self.profiler = profiler or NullProfiler()
+
+        factor = rendition["resize"]
+        if factor != 1.0:
+            # libx264 with yuv420p needs even dimensions
+            w, h = int(size[0] * factor), int(size[1] * factor)
+            self.size = (max(2, w - w % 2), max(2, h - h % 2))
+            self.interpolation = (cv2.INTER_AREA if factor < 1.0
+                                  else cv2.INTER_LINEAR)
+        else:
+            self.size = tuple(size)
+            self.interpolation = None
+
+        compression = COMPRESS_MAP[rendition["level"]]
+        self.writer = FFMPEG_VideoWriter(
+            rendition["path"], self.size, fps,
+            codec="libx264",
+            audiofile=audio_path,
+            preset="veryfast",
+            ffmpeg_params=["-crf", compression["crf"],
+                           "-maxrate", compression["maxrate"],
+                           "-bufsize", compression["maxrate"]]
+        )
+        self.frames = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self.frame_count = 0
+        self.seconds = 0.0
+        self.error = None
+        self._cancelled = threading.Event()
+
+    def put(self, frame):
+        """Queue one RGB frame; raises if this encoder has failed."""
+        while True:
+            if self.error is not None:
+                raise self.error
+            try:
+                self.frames.put(frame, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def finish(self):
+        """Flush the remaining frames and wait for ffmpeg to finish the file."""
+        self.put(None)
+        self.join()
+        if self.error is not None:
+            raise self.error
+
+    def cancel(self):
+        self._cancelled.set()
+        if self.ident is not None:
+            self.join()
+            return
+        # Never started → nothing else will close the ffmpeg process
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+    def run(self):
+        with self.profiler.thread_profile():
+            self._encode()
+
+    def _encode(self):
+        started = time.perf_counter()
+        try:
+            while not self._cancelled.is_set():
+                try:
+                    frame = self.frames.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if frame is None:
+                    break
+                if self.interpolation is not None:
+                    with self.profiler.stage("resize"):
+                        frame = cv2.resize(frame, self.size,
+                                           interpolation=self.interpolation)
+                with self.profiler.stage("encode"):
+                    self.writer.write_frame(frame)
+                self.frame_count += 1
+        except Exception as e:
+            self.error = e
+        finally:
+            with self.profiler.stage("encode"):
+                try:
+                    self.writer.close()
+                except Exception as e:
+                    self.error = self.error or e
+            self.seconds = time.perf_counter() - started
+            self.profiler.record_encoder(
+                self.rendition["path"], self.seconds, self.frame_count,
+                self.fps)
+
+
+# ─────────────────────────────────── Profiling ──────────────────────────────────────
+class _StageTimer:
+    """
+    Context manager returned by `RenderProfiler.stage`. Time spent in nested
+    stages is subtracted, so each stage reports its own (exclusive) time.
+    """
+
+    __slots__ = ("profiler", "name", "started", "child_time")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.child_time = 0.0
+
+    def __enter__(self):
+        self.profiler._stack().append(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        stack = self.profiler._stack()
+        stack.pop()
+        if stack:
+            stack[-1].child_time += elapsed
+        self.profiler.record(self.name, elapsed - self.child_time)
+        return False
+
+
+class _ThreadProfile:
+    """Per-thread cProfile collected by `RenderProfiler.thread_profile`."""
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.profile = None
+
+    def __enter__(self):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+: cProfile hooks sys.monitoring, which already
+            # covers every thread and allows only one active profiler
+            return self
+        self.profile = profile
+        return self
+
+    def __exit__(self, *exc):
+        if self.profile is not None:
+            self.profile.disable()
+            with self.profiler._lock:
+                self.profiler._thread_profiles.append(self.profile)
+        return False
+
+
+class RenderProfiler:
+    """
+    Collects per-stage timings, frame counters and memory high-water marks for
+    one render, and writes them as a JSON report next to the output file.
+
+    - stage(name)  → context manager timing one call of a pipeline stage
+    - count(name)  → bump a named counter (frames decoded, written, …)
+    - optionally captures a cProfile (*.prof) of the processing thread, merged
+      with the encoder threads that run under `thread_profile()`
+
+    tracemalloc and cProfile are process-wide, so only one instrumented render
+    may run at a time; `start` raises if another one is active.
+    """
+
+    enabled = True
+    RSS_SAMPLE_INTERVAL = 0.1       # seconds between job RSS samples
+    _active = threading.Lock()
+
+    def __init__(self, capture_cprofile=False):
+        self.timings = {}           # stage name → list of per-call seconds
+        self.counters = {}
+        self.info = {}
+        self.encoders = {}          # rendition path → seconds/frames/speed
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._cprofile = cProfile.Profile() if capture_cprofile else None
+        self._thread_profiles = []
+        self._started = None
+        self._wall_time = 0.0
+        self._owns_tracemalloc = False
+        self._sampling = threading.Event()
+        self._sampler = None
+        self._peak_rss = {"self": None, "children": None}
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def start(self):
+        if not RenderProfiler._active.acquire(blocking=False):
+            raise Exception("Another profiled render is already running; "
+                            "wait for it to finish.")
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        self._sampler = threading.Thread(target=self._sample_rss, daemon=True)
+        self._sampler.start()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        self._started = time.perf_counter()
+
+    def stop(self):
+        if self._started is None:
+            return
+        self._wall_time = time.perf_counter() - self._started
+        self._started = None
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        self._sampling.set()
+        self._sampler.join()
+        self.info["peak_tracemalloc_mb"] = round(
+            tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+        RenderProfiler._active.release()
+
+    def _sample_rss(self):
+        """
+        Track this job's RSS high-water marks (ru_maxrss is a lifetime peak,
+        useless in the GUI or a long-lived service worker).
+        """
+        while True:
+            for key, children in (("self", False), ("children", True)):
+                rss = current_rss_mb(children)
+                if rss is not None and (self._peak_rss[key] is None
+                                        or rss > self._peak_rss[key]):
+                    self._peak_rss[key] = rss
+            if self._sampling.wait(self.RSS_SAMPLE_INTERVAL):
+                return
+
+    def thread_profile(self):
+        """
+        cProfile only sees the thread that enabled it: worker threads run their
+        body under this so their profile is merged into the .prof file.
+        """
+        if self._cprofile is None:
+            return nullcontext()
+        return _ThreadProfile(self)
+
+    def stage(self, name):
+        return _StageTimer(self, name)
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.timings.setdefault(name, []).append(seconds)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def record_encoder(self, path, seconds, frames, fps):
+        """Per-rendition totals, reported by each RenditionWriter when done."""
+        with self._lock:
+            self.encoders[path] = {
+                "seconds": round(seconds, 3),
+                "frames": frames,
+                "fps": round(frames / seconds, 2) if seconds else None,
+                "speed": round(frames / fps / seconds, 2) if seconds and fps else None,
+            }
+
+    def build_report(self):
+        stages = {}
+        total_stage_time = sum(sum(v) for v in self.timings.values()) or 1.0
+        for name, samples in self.timings.items():
+            arr = np.asarray(samples) * 1000.0
+            p50, p90, p99 = np.percentile(arr, [50, 90, 99])
+            stages[name] = {
+                "calls": len(samples),
+                "total_s": round(float(arr.sum()) / 1000.0, 4),
+                "share": round(float(arr.sum()) / 1000.0 / total_stage_time, 4),
+                "mean_ms": round(float(arr.mean()), 3),
+                "p50_ms": round(float(p50), 3),
+                "p90_ms": round(float(p90), 3),
+                "p99_ms": round(float(p99), 3),
+                "max_ms": round(float(arr.max()), 3),
+            }
+
+        frames = self.counters.get("frames_written", 0)
+        # Renditions encode concurrently → speed comes from wall-clock time
+        encode_wall = self.info.get("encode_wall_s") or 0.0
+        clip_duration = self.info.get("clip_duration_s") or 0.0
+
+        return {
+            "wall_time_s": round(self._wall_time, 3),
+            "frames_per_second": round(frames / self._wall_time, 2) if self._wall_time else None,
+            "counters": dict(self.counters),
+            "stages": dict(sorted(stages.items(),
+                                  key=lambda kv: kv[1]["total_s"], reverse=True)),
+            "memory": {
+                # sampled every RSS_SAMPLE_INTERVAL while this job ran
+                "job_peak_rss_mb": self._peak_rss["self"],
+                "job_peak_rss_children_mb": self._peak_rss["children"],
+                "peak_tracemalloc_mb": self.info.get("peak_tracemalloc_mb"),
+                # whole-process lifetime peaks, including earlier jobs
+                "process_peak_rss_mb": peak_rss_mb(),
+                "process_peak_rss_children_mb": peak_rss_mb(children=True),
+            },
+            "encoder": {
+                "wall_s": round(encode_wall, 3),
+                "speed": round(clip_duration / encode_wall, 2) if encode_wall else None,
+                "renditions": dict(self.encoders),
+            },
+            "info": {k: v for k, v in self.info.items()
+                     if k not in ("peak_tracemalloc_mb", "encode_wall_s")},
+        }
+
+    def write_report(self, output_video):
+        """
+        Write `<output>.profile.json` (and `<output>.prof` when cProfile capture
+        is on). Returns the path of the JSON report.
+        """
+        report_path = f"{output_video}.profile.json"
+        with open(report_path, "w", encoding="utf-8") as fh:
+            json.dump(self.build_report(), fh, indent=2)
+        if self._cprofile is not None:
+            stats = pstats.Stats(self._cprofile)
+            for profile in self._thread_profiles:
+                stats.add(profile)
+            stats.dump_stats(f"{output_video}.prof")
+        return report_path
+
+
+class NullProfiler:
+    """Drop-in stand-in for `RenderProfiler` when instrumentation is off."""
+
+    enabled = False
+    _null_stage = nullcontext()
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def stage(self, name):
+        return self._null_stage
+
+    def record(self, name, seconds):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+    def record_encoder(self, path, seconds, frames, fps):
+        pass
+
+    def thread_profile(self):
+        return self._null_stage
+
+
+def current_rss_mb(children=False):
+    """
+    Current resident set size in MB of this process, or the sum over its
+    child processes (the ffmpeg encoders). Returns None where unavailable.
+    """
+    if psutil is not None:
+        proc = psutil.Process()
+        procs = proc.children(recursive=True) if children else [proc]
+        total = 0
+        for p in procs:
+            try:
+                total += p.memory_info().rss
+            except psutil.Error:
+                pass
+        return round(total / 2**20, 2)
+
+    if sys.platform.startswith("linux"):
+        if children:
+            pids = []
+            for task in os.listdir("/proc/self/task"):
+                try:
+                    with open(f"/proc/self/task/{task}/children") as fh:
+                        pids.extend(fh.read().split())
+                except OSError:
+                    pass
+        else:
+            pids = ["self"]
+        total = 0
+        for pid in pids:
+            try:
+                with open(f"/proc/{pid}/statm") as fh:
+                    total += int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+            except (OSError, ValueError, IndexError):
+                pass
+        return round(total / 2**20, 2)
+    return None
+
+
+def peak_rss_mb(children=False):
+    """
+    Lifetime peak resident set size in MB of this process (or of its
+    waited-for child processes such as ffmpeg). Returns None where it can't be
+    measured.
+    """
+    if resource is not None:
+        who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+        peak = resource.getrusage(who).ru_maxrss
+        # Linux reports KiB, macOS reports bytes
+        scale = 2**20 if os.uname().sysname == "Darwin" else 2**10
+        return round(peak / scale, 2)
+    if psutil is not None and not children:
+        mem = psutil.Process().memory_info()
+        return round(getattr(mem, "peak_wset", mem.rss) / 2**20, 2)
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FrameWise Video Editor")
+    parser.add_argument("--serve", action="store_true",
+                        help="run the local render service instead of the GUI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--allow-remote", action="store_true",
+                        help="allow --host to be a non-loopback address "
+                             "(anyone who can reach it can write files)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: half the CPU cores)")
+    parser.add_argument("--watch", metavar="DIR",
+                        help="render videos dropped into DIR automatically")
+    parser.add_argument("--job-template", metavar="JSON",
+                        help="settings applied to drop-folder jobs")
+    args = parser.parse_args(argv)
+
+    if not args.serve:
+        root = tk.Tk()
+        VideoEditorApp(root)
+        root.mainloop()
+        return
+
+    job_template = {}
+    if args.job_template:
+        with open(args.job_template, encoding="utf-8") as fh:
+            job_template = json.load(fh)
+    try:
+        service = RenderService(args.host, args.port, args.workers,
+                                watch_dir=args.watch, job_template=job_template,
+                                allow_remote=args.allow_remote)
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = VideoEditorApp(root)
-    root.mainloop()
+    main()